@@ -0,0 +1,64 @@
+import time
+
+
+class Win32Backend():
+	"""Real mouse and keyboard through win32api and pyautogui, Windows only"""
+	def __init__(self):
+		import pyautogui
+		import win32api, win32con
+		self.pyautogui = pyautogui
+		self.win32api = win32api
+		self.win32con = win32con
+
+	def click(self, x, y):
+		self.win32api.SetCursorPos((x, y))
+		self.win32api.mouse_event(self.win32con.MOUSEEVENTF_LEFTDOWN, 0, 0)
+		self.win32api.mouse_event(self.win32con.MOUSEEVENTF_LEFTUP, 0, 0)
+
+	def clickMany(self, points):
+		for x, y in points:
+			self.click(x, y)
+
+	def keyPress(self, key):
+		self.pyautogui.keyDown(key)
+		time.sleep(.1)
+		self.pyautogui.keyUp(key)
+
+	def position(self):
+		return self.pyautogui.position()
+
+	def screenshot(self, region):
+		return self.pyautogui.screenshot(region=region)
+
+
+class RecordingBackend():
+	"""
+	Records every event instead of sending it, for tests on any platform \n
+	events holds ('click', x, y) and ('key', key) tuples in order
+	"""
+	def __init__(self, cursor=(0, 0), image=None):
+		self.events = []
+		self.cursor = cursor
+		# Returned by screenshot(), cropped to the region when it is an array
+		self.image = image
+
+	def click(self, x, y):
+		self.events.append(('click', x, y))
+
+	def clickMany(self, points):
+		self.events.extend(('click', x, y) for x, y in points)
+
+	def keyPress(self, key):
+		self.events.append(('key', key))
+
+	def position(self):
+		return self.cursor
+
+	def screenshot(self, region):
+		if self.image is None or not hasattr(self.image, 'shape'):
+			return self.image
+		x, y, width, height = region
+		return self.image[y:y + height, x:x + width]
+
+	def getClicks(self):
+		return [event[1:] for event in self.events if event[0] == 'click']
@@ -0,0 +1,73 @@
+import numpy as np
+
+from board import Board
+
+
+class BoardBatch():
+	"""
+	Mine layouts and neighbor counts of many games of the same size, stacked
+	in (games, rows, cols) arrays \n
+	Every game draws from its own generator seeded with its seed, the bombs
+	are the nbBombs cells with the smallest random keys once the cells around
+	the first click are excluded. The layouts are not the ones Board.setBombs
+	draws for the same seed
+	"""
+	def __init__(self, size, nbBombs, seeds, firstClicks):
+		self.size = tuple(size)
+		self.nbBombs = nbBombs
+		self.seeds = list(seeds)
+		rows, cols = self.size
+		cells = rows * cols
+		firstClicks = np.broadcast_to(np.asarray(firstClicks, dtype=np.int64), (len(self.seeds), 2))
+		self.firstClicks = firstClicks
+
+		banned = self.getBanZones(firstClicks)
+		if self.nbBombs > cells - banned.sum(axis=1).max(initial=0):
+			raise ValueError(f'Cannot place {self.nbBombs} bombs outside the start zone')
+
+		keys = np.empty((len(self.seeds), cells), dtype=np.float32)
+		for game, seed in enumerate(self.seeds):
+			np.random.default_rng(seed).random(dtype=np.float32, out=keys[game])
+		# Keys are in [0, 1), banned cells sort after every allowed one
+		keys[banned] = 2.0
+
+		self.mines = np.zeros((len(self.seeds), cells), dtype=np.uint8)
+		if self.nbBombs:
+			bombs = np.argpartition(keys, self.nbBombs - 1, axis=1)[:, :self.nbBombs]
+			np.put_along_axis(self.mines, bombs, 1, axis=1)
+		self.mines = self.mines.reshape(len(self.seeds), rows, cols)
+		self.counts = self.countAround(self.mines)
+
+	def __len__(self):
+		return len(self.seeds)
+
+	def getBanZones(self, firstClicks):
+		"""(games, cells) mask of the first click and its neighbors"""
+		rows, cols = self.size
+		rowDistance = np.abs(np.arange(rows)[None, :] - firstClicks[:, 0:1])
+		colDistance = np.abs(np.arange(cols)[None, :] - firstClicks[:, 1:2])
+		return ((rowDistance[:, :, None] <= 1) & (colDistance[:, None, :] <= 1)).reshape(len(firstClicks), rows * cols)
+
+	def countAround(self, mines):
+		"""Sum the 8 shifted copies of every padded layout at once"""
+		rows, cols = self.size
+		padded = np.pad(mines, ((0, 0), (1, 1), (1, 1)))
+		counts = np.zeros_like(mines)
+		for dRow in range(3):
+			for dCol in range(3):
+				if dRow != 1 or dCol != 1:
+					counts += padded[:, dRow:dRow + rows, dCol:dCol + cols]
+		return counts
+
+	def getBoard(self, game):
+		"""Board of one game with its bombs placed, ready for the first click"""
+		board = Board(self.size, self.nbBombs, self.seeds[game])
+		board.loadMines(self.mines[game].tobytes(), self.counts[game].tobytes())
+		return board
+
+	def getFirstClick(self, game):
+		return int(self.firstClicks[game, 0]), int(self.firstClicks[game, 1])
+
+	def __iter__(self):
+		for game in range(len(self)):
+			yield self.getBoard(game)
@@ -0,0 +1,125 @@
+import argparse
+import json
+import platform
+import sys
+import time
+
+import csp
+from board import Board
+from simulate import getFirstClick
+from solver import Solver
+
+# Pinned seed corpora, never change the seeds of an existing corpus or
+# its results stop being comparable with older baselines
+CORPORA = {
+	'beginner': {'size': (9, 9), 'bombs': 10, 'seeds': range(1000, 1200)},
+	'intermediate': {'size': (16, 16), 'bombs': 40, 'seeds': range(2000, 2100)},
+	'expert': {'size': (16, 30), 'bombs': 99, 'seeds': range(3000, 3100)},
+	'huge': {'size': (100, 100), 'bombs': 2000, 'seeds': range(4000, 4005)},
+	'giant': {'size': (1000, 1000), 'bombs': 150000, 'seeds': range(5000, 5002), 'solve': False},
+}
+
+# Legacy rules timed in pipeline order on the same solver, as solve(exact=False) runs them
+PHASES = ['basicDeduction', 'advancedLogic', 'mineCountLogic', 'singleBombLogic']
+
+# mineCountLogic tries every combination of subsets, solve() only calls it below this
+MINE_COUNT_LIMIT = 20
+
+
+def timed(function, *args):
+	start = time.perf_counter()
+	result = function(*args)
+	return result, time.perf_counter() - start
+
+
+def benchGame(size, bombs, seed, solve=True):
+	"""Return the time spent in every measured step of one seeded game"""
+	timings = {}
+	position = getFirstClick(size, 'center', seed)
+
+	def build():
+		board = Board(size, bombs, seed)
+		board.setBombs(position)
+		return board
+
+	board, timings['construction'] = timed(build)
+	_, timings['floodFill'] = timed(board.handleClick, board.getCell(position[0], position[1]), False)
+	if not solve:
+		return timings
+
+	solver = Solver(board.copy(), exact=False)
+	for phase in PHASES:
+		if phase == 'mineCountLogic' and solver.board.getFlagToFind() > MINE_COUNT_LIMIT:
+			continue
+		_, timings[phase] = timed(getattr(solver, phase))
+
+	# Every phase starts from a cold component cache, or solve would reuse what exactLogic just solved
+	for phase in ('linearLogic', 'exactLogic', 'solve'):
+		csp.defaultCache.clear()
+		_, timings[phase] = timed(getattr(Solver(board.copy()), phase))
+	return timings
+
+
+def benchCorpus(corpus):
+	samples = {}
+	for seed in corpus['seeds']:
+		for name, duration in benchGame(corpus['size'], corpus['bombs'], seed, corpus.get('solve', True)).items():
+			samples.setdefault(name, []).append(duration)
+
+	return {
+		'size': list(corpus['size']),
+		'bombs': corpus['bombs'],
+		'games': len(corpus['seeds']),
+		'timings': {
+			name: {'mean': sum(values) / len(values), 'min': min(values), 'max': max(values), 'samples': len(values)}
+			for name, values in samples.items()
+		},
+	}
+
+
+def compare(results, baseline, threshold):
+	"""Return one line per timing whose mean grew by more than threshold over the baseline"""
+	regressions = []
+	for corpus, result in results['corpora'].items():
+		previous = baseline['corpora'].get(corpus)
+		if not previous:
+			continue
+		for name, timing in result['timings'].items():
+			before = previous['timings'].get(name)
+			if not before or not before['mean']:
+				continue
+			ratio = timing['mean'] / before['mean']
+			if ratio > 1 + threshold:
+				regressions.append(f'{corpus}.{name}: {before["mean"] * 1000:.3f} ms -> {timing["mean"] * 1000:.3f} ms ({ratio:.2f}x)')
+	return regressions
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Time board setup and solver phases on pinned seed corpora')
+	parser.add_argument('--corpus', nargs='+', choices=list(CORPORA), default=[name for name in CORPORA if name != 'giant'])
+	parser.add_argument('--output', help='write the results as JSON to this file')
+	parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+	parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown before a timing counts as a regression')
+	args = parser.parse_args(argv)
+
+	results = {'python': platform.python_version(), 'corpora': {}}
+	for name in args.corpus:
+		results['corpora'][name] = benchCorpus(CORPORA[name])
+		for timing, values in results['corpora'][name]['timings'].items():
+			print(f'{name:>12} {timing:<16} {values["mean"] * 1000:10.3f} ms')
+
+	if args.output:
+		with open(args.output, 'w') as file:
+			json.dump(results, file, indent=2)
+
+	if args.baseline:
+		with open(args.baseline) as file:
+			regressions = compare(results, json.load(file), args.threshold)
+		for line in regressions:
+			print(f'REGRESSION {line}')
+		if regressions:
+			sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
@@ -1,14 +1,100 @@
+import copy
+import itertools
 import random
-import time
+import threading
+from collections import deque
 
 from cell import Cell
+from frontier import Frontier
+
+
+class Layout():
+	"""
+	Neighbor index table shared by every board of the same size \n
+	Cells are indexed by row * width + col, each one only stores the kind of
+	border it sits on and the neighbor offsets are looked up per kind
+	"""
+	def __init__(self, size):
+		self.size = size
+		self.width = size[1]
+		# 0 first line, 1 middle, 2 last line, 3 single line
+		steps = [(0, 1), (-1, 0, 1), (-1, 0), (0,)]
+		self.offsets = []
+		for vertical in steps:
+			for horizontal in steps:
+				self.offsets.append(tuple(
+					dRow * self.width + dCol
+					for dRow in vertical for dCol in horizontal
+					if dRow or dCol
+				))
+		self.kinds = bytearray()
+		for vertical in self.getLineKinds(size[0]):
+			self.kinds += bytes(vertical * 4 + horizontal for horizontal in self.getLineKinds(size[1]))
+
+	def getLineKinds(self, length):
+		if length == 1:
+			return [3]
+		return [0] + [1] * (length - 2) + [2]
+
+	def neighbors(self, index):
+		return [index + offset for offset in self.offsets[self.kinds[index]]]
+
+	def getColumnMasks(self):
+		"""Byte masks dropping the first and the last column, built on first use"""
+		if not hasattr(self, 'columnMasks'):
+			height, width = self.size
+			notFirst = (bytes(1) + b'\xff' * (width - 1)) * height
+			notLast = (b'\xff' * (width - 1) + bytes(1)) * height
+			self.columnMasks = int.from_bytes(notFirst, 'little'), int.from_bytes(notLast, 'little')
+		return self.columnMasks
+
+	def countAround(self, mines):
+		"""
+		Count the mines around every cell as a sum of shifted mine masks \n
+		Each cell is one byte lane of a big integer, a count never exceeds 8
+		so the lanes never carry into each other
+		"""
+		cells = len(mines)
+		notFirst, notLast = self.getColumnMasks()
+		mask = int.from_bytes(mines, 'little')
+		rows = mask + ((mask << 8) & notFirst) + ((mask >> 8) & notLast)
+		line = 8 * self.width
+		total = (rows + (rows << line) + (rows >> line)) & ((1 << (8 * cells)) - 1)
+		return bytearray((total - mask).to_bytes(cells, 'little'))
+
+
+_layouts = {}
+# Guards the module level state, boards may be created from several threads
+_lock = threading.Lock()
+
+# Generated seeds are a random per-process prefix followed by a counter, so
+# boards created together never share a seed, in this process or another one
+_seedPrefix = random.SystemRandom().getrandbits(31) << 32
+_seedCounter = itertools.count()
+
+def getLayout(size):
+	size = tuple(size)
+	layout = _layouts.get(size)
+	if layout is None:
+		with _lock:
+			if size not in _layouts:
+				layout = Layout(size)
+				layout.getColumnMasks()
+				_layouts[size] = layout
+			layout = _layouts[size]
+	return layout
+
 
 class Board():
-	def __init__(self, size, nbBombs):
+	def __init__(self, size, nbBombs, seed=None, legacyPlacement=False):
 		self.size = size
 		self.nbBombs = nbBombs
-		self.seed = self.getSeed() 
-		print(self.seed)
+		self.legacyPlacement = legacyPlacement
+		if seed is None:
+			seed = self.getSeed()
+			print(seed)
+		self.seed = seed
+		self.rng = random.Random(seed)
 		self.lost = False
 		self.numClicked = 0
 		self.numNonBombs = size[0] * size[1] - nbBombs
@@ -16,40 +102,106 @@ class Board():
 		self.flagged = 0
 
 	def getSeed(self):
-		return int(time.time())
+		with _lock:
+			return _seedPrefix | (next(_seedCounter) & 0xffffffff)
 
 	def setBoard(self):
-		self.board = []
-		for r in range(self.size[0]):
-			row = []
-			for c in range(self.size[1]):
-				cell = Cell((r, c))
-				row.append(cell)
-			self.board.append(row)
+		self.layout = getLayout(self.size)
+		self.width = self.size[1]
+		cells = self.size[0] * self.size[1]
+		self.mines = bytearray(cells)
+		self.flags = bytearray(cells)
+		self.revealed = bytearray(cells)
+		self.counts = bytearray(cells)
+		self.bombsLocation = []
+		self.frontier = Frontier(self)
+
+	def copy(self):
+		"""Return an independent copy of the game state, the layout stays shared"""
+		board = copy.copy(self)
+		board.mines = bytearray(self.mines)
+		board.flags = bytearray(self.flags)
+		board.revealed = bytearray(self.revealed)
+		board.counts = bytearray(self.counts)
+		board.bombsLocation = list(self.bombsLocation)
+		board.rng = random.Random()
+		board.rng.setstate(self.rng.getstate())
+		board.frontier = self.frontier.copy(board)
+		return board
 
 	def setBombs(self, startPosition):
-		seed = self.seed
-		# seed = 123
-		random.seed(seed)
-		self.bombsLocation = []
+		"""
+		Place the bombs anywhere but around the startPosition \n
+		Bombs are drawn without replacement from the allowed cells in one pass.
+		Boards built with legacyPlacement=True use the original rejection
+		sampling instead, which reproduces the layouts of older versions for
+		the same seed \n
+		The board draws from its own generator, reseeded here so the layout
+		only depends on the seed. random.Random(seed) follows the same sequence
+		as the random.seed(seed) older versions called
+		"""
+		self.rng.seed(self.seed)
 		# Get the neighbors of the startPosition
 		banZone = self.getListOfNeighborsPosition(startPosition)
+		if self.nbBombs > len(self.mines) - len(banZone):
+			raise ValueError(f'Cannot place {self.nbBombs} bombs outside the start zone')
 
-		for bomb in range(self.nbBombs):
-			bombLoc = self.createBomb(banZone)
-			cell = self.getCell(bombLoc[0], bombLoc[1])
-			cell.setHasBomb(True)
-			self.bombsLocation.append(bombLoc)
+		if self.legacyPlacement:
+			self.bombsLocation = self.createBombsLegacy(banZone)
+		else:
+			self.bombsLocation = self.createBombs(banZone)
+
+		for row, col in self.bombsLocation:
+			self.mines[self.getIndex(row, col)] = 1
 		
 		# self.printBoard()
 		self.setNeighbors()
 
-	def createBomb(self, banZone):
-		position = (random.randrange(0, self.size[0]), random.randrange(0, self.size[1]))
-		if (position not in self.bombsLocation) and (position not in banZone):
-			return position
+	def loadMines(self, mines, counts=None):
+		"""Place the bombs from a 0/1 mine array built elsewhere, counts are computed when not given"""
+		self.mines[:] = mines
+		self.bombsLocation = [self.getPosition(index) for index in range(len(self.mines)) if self.mines[index]]
+		if counts is None:
+			self.setNeighbors()
 		else:
-			return self.createBomb(banZone)
+			self.counts = bytearray(counts)
+
+	def loadView(self, revealed, counts, flags):
+		"""
+		Set the board to what a player sees of a game played elsewhere \n
+		The mines are unknown, so the board can be analyzed but not clicked
+		"""
+		self.setBoard()
+		self.revealed[:] = revealed
+		self.counts[:] = counts
+		self.flags[:] = flags
+		self.numClicked = sum(self.revealed)
+		self.flagged = sum(self.flags)
+		for index in range(len(self.revealed)):
+			if self.revealed[index]:
+				self.frontier.track(index, zero=True)
+
+	def createBombs(self, banZone):
+		banned = sorted(self.getIndex(row, col) for row, col in banZone)
+		bombs = []
+		for index in self.rng.sample(range(len(self.mines) - len(banned)), self.nbBombs):
+			# Skip over the banned indexes to map the pick onto the allowed cells
+			for ban in banned:
+				if ban > index:
+					break
+				index += 1
+			bombs.append(self.getPosition(index))
+		return bombs
+
+	def createBombsLegacy(self, banZone):
+		bombs = []
+		taken = set(banZone)
+		while len(bombs) < self.nbBombs:
+			position = (self.rng.randrange(0, self.size[0]), self.rng.randrange(0, self.size[1]))
+			if position not in taken:
+				taken.add(position)
+				bombs.append(position)
+		return bombs
 
 	def getSize(self):
 		return self.size
@@ -58,26 +210,19 @@ class Board():
 		return self.nbBombs
 	
 	def getCell(self, row, col):
-		return self.board[row][col]
+		return Cell(self, row * self.width + col)
+
+	def getIndex(self, row, col):
+		return row * self.width + col
+
+	def getPosition(self, index):
+		return divmod(index, self.width)
 	
 	def setNeighbors(self):
-		for row in range(self.size[0]):
-			for col in range(self.size[1]):
-				cell = self.getCell(row, col)
-				neighbors = self.getListOfNeighbors((row, col))
-				cell.setNeighbors(neighbors)
+		self.counts = self.layout.countAround(self.mines)
 
 	def getListOfNeighbors(self, index):
-		neighbors = []
-		for row in range(index[0] - 1, index[0] + 2):
-			for col in range(index[1] - 1, index[1] + 2):
-				out_of_bound = row < 0 or row >= self.size[0] or col < 0 or col >= self.size[1]
-				same = row == index[0] and col == index[1]
-				if out_of_bound or same:
-					continue
-				neighbors.append(self.getCell(row, col))
-
-		return neighbors
+		return self.getCell(index[0], index[1]).getNeighbors()
 	
 	def getListOfNeighborsPosition(self, index):
 		neighbors = []
@@ -97,49 +242,68 @@ class Board():
 		"""
 		Handle the click \n
 		True for Flag \n
-		False for Reveal
+		False for Reveal \n
+		Return the positions of the newly revealed cells
 		"""
-		if not flag and cell.getHasFlag():
-			return
+		index = cell.index
+		if not flag and self.flags[index]:
+			return []
 		
-		if cell.getIsClicked():
-			if cell.getNumAround() == self.countFlags(cell):
-				for neighbor in cell.getNeighbors():
-					if not neighbor.getIsClicked():
-						self.handleClick(neighbor, 0)
+		if self.revealed[index]:
+			if self.counts[index] == self.countFlags(cell):
+				return self.reveal([neighbor for neighbor in self.layout.neighbors(index) if not self.revealed[neighbor]])
+			return []
 		
-		if flag and not cell.getIsClicked():
-			cell.toggleFlag()
-			if cell.getHasFlag():
+		if flag:
+			self.flags[index] ^= 1
+			self.frontier.toggleFlag(index)
+			if self.flags[index]:
 				self.flagged += 1
-				return
+				return []
 			self.flagged -= 1
-			return
+			return []
 		
-		if not cell.getIsClicked():
+		return self.reveal([index])
+
+	def reveal(self, indexes):
+		"""Reveal the cells and flood fill from every zero, breadth first"""
+		revealed = []
+		queued = bytearray(len(self.revealed))
+		for index in indexes:
+			queued[index] = 1
+		queue = deque(indexes)
+
+		while queue:
+			index = queue.popleft()
+			if self.revealed[index] or self.flags[index]:
+				continue
+
+			self.revealed[index] = 1
 			self.numClicked += 1
-		
-		cell.setIsClicked(True)
-		
-		if cell.getHasBomb():
-			self.lost = True
-			return
-		
-		if cell.getNumAround() != 0:
-			return
-		
-		for neighbor in cell.getNeighbors():
-			if not neighbor.getIsClicked():
-				self.handleClick(neighbor, 0)
+			self.frontier.reveal(index)
+			revealed.append(self.getPosition(index))
+
+			if self.mines[index]:
+				self.lost = True
+				continue
+
+			if self.counts[index] != 0:
+				continue
+
+			for neighbor in self.layout.neighbors(index):
+				if not queued[neighbor]:
+					queued[neighbor] = 1
+					queue.append(neighbor)
+
+		return revealed
 
 	def getFlagToFind(self):
 		return self.nbBombs - self.flagged
 
 	def countFlags(self, cell: Cell):
 		flags = 0
-		for neighbor in cell.getNeighbors():
-			if neighbor.getHasFlag():
-				flags += 1
+		for neighbor in self.layout.neighbors(cell.index):
+			flags += self.flags[neighbor]
 		return flags
 	
 	def getLost(self):
@@ -153,7 +317,7 @@ class Board():
 		for row in range(self.size[0]):
 			print('\r')
 			for col in range(self.size[1]):
-				if self.board[row][col].getHasBomb() == True:
+				if self.mines[self.getIndex(row, col)]:
 					print('x', end='')
 					continue
 				print('O', end='')
@@ -1,44 +1,43 @@
 class Cell():
-	def __init__(self, position, hasBomb = False, hasFlag = False, isClicked = False):
-		self.position = position
-		self.hasBomb = hasBomb
-		self.hasFlag = hasFlag
-		self.isClicked = isClicked
-		self.numAround = 0
+	"""View over one square of a Board, its state lives in the board's flat arrays"""
+	__slots__ = ('board', 'index')
+
+	def __init__(self, board, index):
+		self.board = board
+		self.index = index
+
+	def __eq__(self, other):
+		return isinstance(other, Cell) and self.board is other.board and self.index == other.index
+
+	def __hash__(self):
+		return hash((id(self.board), self.index))
 
 	def getHasBomb(self):
-		return self.hasBomb
-	
+		return bool(self.board.mines[self.index])
+
 	def getHasFlag(self):
-		return self.hasFlag
-	
+		return bool(self.board.flags[self.index])
+
 	def getIsClicked(self):
-		return self.isClicked
-	
+		return bool(self.board.revealed[self.index])
+
 	def setIsClicked(self, value: bool):
-		self.isClicked = value
-	
-	def setHasBomb(self, value: bool):
-		self.hasBomb = value
+		if value and not self.board.revealed[self.index]:
+			self.board.revealed[self.index] = 1
+			self.board.frontier.reveal(self.index)
 
-	def setNeighbors(self, neighbors):
-		self.neighbors = neighbors
-		self.setNumAround()
+	def setHasBomb(self, value: bool):
+		self.board.mines[self.index] = value
 
 	def getNeighbors(self):
-		return self.neighbors
-	
-	def setNumAround(self):
-		self.numAround = 0
-		for cell in self.neighbors:
-			if cell.getHasBomb():
-				self.numAround += 1
-	
+		return [Cell(self.board, index) for index in self.board.layout.neighbors(self.index)]
+
 	def getNumAround(self):
-		return self.numAround
-	
+		return self.board.counts[self.index]
+
 	def toggleFlag(self):
-		self.hasFlag = not self.getHasFlag()
+		self.board.flags[self.index] ^= 1
+		self.board.frontier.toggleFlag(self.index)
 
 	def getPosition(self):
-		return self.position
\ No newline at end of file
+		return divmod(self.index, self.board.width)
@@ -1,13 +1,14 @@
-import pyautogui
-import time
-import win32api, win32con
-
+from backend import Win32Backend
 from board import Board
 from cell import Cell
 
+# Palette position of every value in the external tool, 'True' is the flag
+OPTIONS = ['1', '2', '3', '4', '5', '6', '7', '8', '0', 'True']
+
 class Check():
-	def __init__(self, board: Board):
+	def __init__(self, board: Board, backend=None):
 		self.board: Board = board
+		self.backend = backend or Win32Backend()
 		self.width = self.board.getSize()[1]
 		self.height = self.board.getSize()[0]
 		self.startX = 1430 - ((self.width//2) * 32)
@@ -17,62 +18,45 @@ class Check():
 
 
 	def click(self, x, y):
-		win32api.SetCursorPos((x, y))
-		win32api.mouse_event(win32con.MOUSEEVENTF_LEFTDOWN, 0, 0)
-		win32api.mouse_event(win32con.MOUSEEVENTF_LEFTUP, 0, 0)
+		self.backend.click(x, y)
 
 	def keyPress(self, key):
-		pyautogui.keyDown(key)
-		time.sleep(.1)
-		pyautogui.keyUp(key)
+		self.backend.keyPress(key)
 
 	def getCellStatus(self, row, col):
 		cell: Cell = self.board.getCell(row, col)
 
 	def options(self, status):
-		match status:
-			case '1':
-				offset = 0
-			case '2':
-				offset = 1
-			case '3':
-				offset = 2
-			case '4':
-				offset = 3
-			case '5':
-				offset = 4
-			case '6':
-				offset = 5
-			case '7':
-				offset = 6
-			case '8':
-				offset = 7
-			case '0':
-				offset = 8
-			case 'True':
-				offset = 9
-
+		offset = OPTIONS.index(status)
 		self.click(self.optionStartX + (40 * offset), self.optionStartY)
-		
 
-	def checkBoard(self):
-		x, y = pyautogui.position()
-		# Reset board
-		self.click(1000, 700)
-		self.keyPress('F2')
+	def getCellPoint(self, row, col):
+		return self.startX + (col * 32), self.startY + (row * 32)
+
+	def getClickPlan(self):
+		"""
+		Group the cells to enter by palette option \n
+		Returns (option, points) pairs in palette order, so every option is
+		selected once however many cells use it
+		"""
+		groups = {}
 		for row in range(self.height):
 			for col in range(self.width):
 				cell: Cell = self.board.getCell(row, col)
-
 				if cell.getHasFlag():
-					self.options(str(cell.getHasFlag()))
-					self.click(self.startX + (col * 32), self.startY + (row * 32))
-
-				if not cell.getIsClicked():
-					continue
+					groups.setdefault(str(cell.getHasFlag()), []).append(self.getCellPoint(row, col))
+				elif cell.getIsClicked():
+					groups.setdefault(str(cell.getNumAround()), []).append(self.getCellPoint(row, col))
+		return [(option, groups[option]) for option in OPTIONS if option in groups]
 
-				self.options(str(cell.getNumAround()))
-				self.click(self.startX + (col * 32), self.startY + (row * 32))
+	def checkBoard(self):
+		x, y = self.backend.position()
+		# Reset board
+		self.click(1000, 700)
+		self.keyPress('F2')
+		for option, points in self.getClickPlan():
+			self.options(option)
+			self.backend.clickMany(points)
 
 		# Find next move
 		self.click(1373, 150)
@@ -80,3 +64,11 @@ class Check():
 		# Return to start
 		self.click(x, y)
 		self.click(x, y)
+
+	def readBoard(self):
+		"""Read the board shown by the external tool back from a screenshot"""
+		from recognize import Recognizer
+		# Clicks land on the cell centers, the grid starts half a cell before
+		region = (self.startX - 16, self.startY - 16, self.width * 32, self.height * 32)
+		image = self.backend.screenshot(region)
+		return Recognizer((32, 32)).read(image, self.board.getSize(), self.board.getNbBombs())
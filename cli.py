@@ -0,0 +1,31 @@
+import argparse
+import importlib
+import sys
+
+# Command -> module holding its main(argv), imported only when the command runs
+# so the solver commands never load pygame or the automation backends
+COMMANDS = {
+	'play': ('game', 'play in a window, needs pygame'),
+	'simulate': ('simulate', 'run the solver over seeded boards'),
+	'tournament': ('tournament', 'run the solver over seeded boards on a pool'),
+	'bench': ('bench', 'time the solver phases on pinned corpora'),
+	'solve': ('service', 'answer boards streamed on stdin with the deduced cells'),
+}
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(
+		description='Minesweeper solver',
+		epilog='\n'.join(f'  {name:<12}{help}' for name, (_, help) in COMMANDS.items()),
+		formatter_class=argparse.RawDescriptionHelpFormatter,
+	)
+	parser.add_argument('command', choices=list(COMMANDS), metavar='command')
+	parser.add_argument('args', nargs=argparse.REMAINDER, help='arguments of the command, see <command> --help')
+	args = parser.parse_args(argv)
+
+	module = importlib.import_module(COMMANDS[args.command][0])
+	return module.main(args.args)
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,392 @@
+import threading
+from collections import OrderedDict
+from math import exp, lgamma, log
+
+# Search nodes allowed per component before giving up on it
+BUDGET = 200_000
+# Components larger than this are left to the heuristics
+MAX_VARIABLES = 400
+
+
+class BudgetExceeded(Exception):
+	pass
+
+
+class Component():
+	"""
+	Every mine arrangement of one independent group of frontier constraints \n
+	counts[k] is the number of arrangements using k mines and
+	cellCounts[k][i] how many of those put a mine on variables[i]
+	"""
+	def __init__(self, variables, constraints):
+		self.variables = variables
+		self.constraints = constraints
+		self.counts = []
+		self.cellCounts = []
+		self.complete = False
+
+
+class Analysis():
+	"""
+	Cells (board indexes) proven safe or proven to be mines \n
+	probabilities holds the mine probability of every constrained cell,
+	every other hidden cell has interiorProbability. They are exact when
+	every component could be enumerated, estimated otherwise \n
+	consistent is False when no mine arrangement fits the board, a flag or
+	the mine count is wrong, and nothing else in the analysis holds then
+	"""
+	def __init__(self):
+		self.safe = set()
+		self.mines = set()
+		self.components = []
+		self.probabilities = {}
+		self.interiorProbability = 0.0
+		self.exact = False
+		self.consistent = True
+
+	def getProbability(self, index):
+		return self.probabilities.get(index, self.interiorProbability)
+
+	def setInconsistent(self):
+		self.safe.clear()
+		self.mines.clear()
+		self.probabilities.clear()
+		self.interiorProbability = 0.0
+		self.exact = False
+		self.consistent = False
+		return self
+
+
+def convolve(a, b):
+	result = [0] * (len(a) + len(b) - 1)
+	for i, x in enumerate(a):
+		if x:
+			for j, y in enumerate(b):
+				result[i + j] += x * y
+	return result
+
+
+def getConstraints(frontier):
+	"""
+	One (cells, mines) constraint per frontier entry, duplicates merged \n
+	Entries over the same cells asking for different counts are both kept,
+	their component then has no solution and the analysis is inconsistent
+	"""
+	constraints = {}
+	for index, hidden in frontier.hidden.items():
+		if hidden:
+			constraints[(frozenset(hidden), frontier.getRemaining(index))] = None
+	return list(constraints)
+
+
+def splitComponents(constraints):
+	"""Group the constraints that share cells, directly or through others"""
+	parent = {}
+
+	def find(cell):
+		while parent[cell] != cell:
+			parent[cell] = parent[parent[cell]]
+			cell = parent[cell]
+		return cell
+
+	for cells, _ in constraints:
+		for cell in cells:
+			parent.setdefault(cell, cell)
+		first = find(next(iter(cells)))
+		for cell in cells:
+			root = find(cell)
+			if root != first:
+				parent[root] = first
+
+	groups = {}
+	for constraint in constraints:
+		groups.setdefault(find(next(iter(constraint[0]))), []).append(constraint)
+	return list(groups.values())
+
+
+def orderVariables(constraints):
+	"""Order the cells so each constraint gets fully assigned as early as possible"""
+	byCell = {}
+	for constraint in constraints:
+		for cell in constraint[0]:
+			byCell.setdefault(cell, []).append(constraint)
+
+	order = []
+	seen = set()
+	for start in sorted(byCell):
+		if start in seen:
+			continue
+		seen.add(start)
+		queue = [start]
+		for cell in queue:
+			order.append(cell)
+			for cells, _ in byCell[cell]:
+				for other in sorted(cells):
+					if other not in seen:
+						seen.add(other)
+						queue.append(other)
+	return order
+
+
+def solveComponent(constraints, budget=BUDGET):
+	"""Enumerate the component with backtracking, checking every constraint's bounds after each assignment"""
+	variables = orderVariables(constraints)
+	component = Component(variables, constraints)
+	size = len(variables)
+	if size > MAX_VARIABLES:
+		return component
+
+	position = {cell: i for i, cell in enumerate(variables)}
+	needed = [count for _, count in constraints]
+	left = [len(cells) for cells, _ in constraints]
+	placed = [0] * len(constraints)
+	byVariable = [[] for _ in variables]
+	for i, (cells, _) in enumerate(constraints):
+		for cell in cells:
+			byVariable[position[cell]].append(i)
+
+	values = [0] * size
+	counts = [0] * (size + 1)
+	cellCounts = [[0] * size for _ in range(size + 1)]
+	nodes = 0
+
+	def search(i, mines):
+		nonlocal nodes
+		nodes += 1
+		if nodes > budget:
+			raise BudgetExceeded()
+		if i == size:
+			counts[mines] += 1
+			tally = cellCounts[mines]
+			for j in range(size):
+				tally[j] += values[j]
+			return
+
+		touched = byVariable[i]
+		for value in (0, 1):
+			valid = True
+			for c in touched:
+				left[c] -= 1
+				placed[c] += value
+				if placed[c] > needed[c] or placed[c] + left[c] < needed[c]:
+					valid = False
+			if valid:
+				values[i] = value
+				search(i + 1, mines + value)
+			for c in touched:
+				left[c] += 1
+				placed[c] -= value
+		values[i] = 0
+
+	try:
+		search(0, 0)
+	except BudgetExceeded:
+		return component
+
+	while len(counts) > 1 and not counts[-1]:
+		counts.pop()
+	component.counts = counts
+	component.cellCounts = cellCounts[:len(counts)]
+	component.complete = True
+	return component
+
+
+class ComponentCache():
+	"""
+	Bounded LRU cache of solved components \n
+	Cells are relabeled in board order, so the same local pattern found
+	elsewhere on the board, or in another game, maps to the same key \n
+	The cache can be shared by games solved on several threads, the lock
+	only covers the lookup and the insertion, not the search
+	"""
+	def __init__(self, maxSize=4096):
+		self.maxSize = maxSize
+		self.entries = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+		self.lock = threading.Lock()
+
+	def __len__(self):
+		return len(self.entries)
+
+	def clear(self):
+		with self.lock:
+			self.entries.clear()
+			self.hits = 0
+			self.misses = 0
+
+	def getStats(self):
+		with self.lock:
+			return {'hits': self.hits, 'misses': self.misses, 'size': len(self.entries), 'maxSize': self.maxSize}
+
+	def solve(self, constraints, budget=BUDGET):
+		cells = sorted(set().union(*(cells for cells, _ in constraints)))
+		label = {cell: i for i, cell in enumerate(cells)}
+		key = tuple(sorted((tuple(sorted(label[cell] for cell in group)), count) for group, count in constraints))
+
+		with self.lock:
+			entry = self.entries.get(key)
+			# Components that ran out of budget are retried with a bigger one
+			if entry is not None and (entry[2] or entry[3] >= budget):
+				self.entries.move_to_end(key)
+				self.hits += 1
+			else:
+				entry = None
+				self.misses += 1
+		if entry is not None:
+			component = Component(cells, constraints)
+			component.counts, component.cellCounts, component.complete = entry[0], entry[1], entry[2]
+			return component
+
+		component = solveComponent(constraints, budget)
+		order = [component.variables.index(cell) for cell in cells] if component.complete else []
+		cellCounts = [[tally[i] for i in order] for tally in component.cellCounts]
+		with self.lock:
+			self.entries[key] = (component.counts, cellCounts, component.complete, budget)
+			self.entries.move_to_end(key)
+			if len(self.entries) > self.maxSize:
+				self.entries.popitem(last=False)
+
+		component.variables = cells
+		component.cellCounts = cellCounts
+		return component
+
+
+defaultCache = ComponentCache()
+
+
+def logChoose(n, k):
+	"""Natural log of the binomial coefficient, None when it is zero"""
+	if not 0 <= k <= n:
+		return None
+	return lgamma(n + 1) - lgamma(k + 1) - lgamma(n - k + 1)
+
+
+def normalize(logs):
+	"""Turn log weights into floats relative to the biggest one, keeping None for impossible ones"""
+	present = [value for value in logs if value is not None]
+	if not present:
+		return None
+	top = max(present)
+	return [exp(value - top) if value is not None else None for value in logs]
+
+
+def logSum(terms):
+	if not terms:
+		return None
+	top = max(terms)
+	return top + log(sum(exp(term - top) for term in terms))
+
+
+def getWeights(components, interior, remaining):
+	"""
+	Relative weight of each mine count of each component once combined
+	with the other components and the unconstrained cells, None for the
+	mine counts the rest of the board cannot complete \n
+	The binomials of big interiors have thousands of digits, so the weights
+	are summed in log space. Return None when a component could not be enumerated
+	"""
+	if not all(component.complete for component in components):
+		return None
+
+	weights = []
+	for i, component in enumerate(components):
+		others = [1]
+		for j, other in enumerate(components):
+			if j != i:
+				others = convolve(others, other.counts)
+		logs = []
+		for k, ways in enumerate(component.counts):
+			terms = []
+			if ways:
+				for s, otherWays in enumerate(others):
+					interiorWays = logChoose(interior, remaining - k - s)
+					if otherWays and interiorWays is not None:
+						terms.append(log(otherWays) + interiorWays)
+			logs.append(logSum(terms))
+		weights.append(normalize(logs))
+	return weights
+
+
+def estimate(component):
+	"""Average mine density of the constraints around each cell of a component too big to enumerate"""
+	densities = {}
+	for cells, count in component.constraints:
+		for cell in cells:
+			densities.setdefault(cell, []).append(count / len(cells))
+	return {cell: sum(values) / len(values) for cell, values in densities.items()}
+
+
+def analyze(board, budget=BUDGET, cache=defaultCache):
+	"""
+	Find every cell the frontier constraints and the mine count decide \n
+	Components are looked up in cache first, pass None to always solve them
+	"""
+	analysis = Analysis()
+	solve = cache.solve if cache is not None else solveComponent
+	components = [solve(constraints, budget) for constraints in splitComponents(getConstraints(board.frontier))]
+	analysis.components = components
+
+	if any(component.complete and not any(component.counts) for component in components):
+		# Contradicting constraints, a flag is wrong
+		return analysis.setInconsistent()
+
+	constrained = sum(len(component.variables) for component in components)
+	interior = len(board.revealed) - board.numClicked - board.flagged - constrained
+	remaining = board.getFlagToFind()
+	if not 0 <= remaining <= constrained + interior:
+		# More flags than mines, or more mines than hidden cells
+		return analysis.setInconsistent()
+	weights = getWeights(components, interior, remaining)
+	analysis.exact = weights is not None
+
+	for i, component in enumerate(components):
+		if not component.complete:
+			analysis.probabilities.update(estimate(component))
+			continue
+		# Without the global count every local arrangement stays possible
+		weight = weights[i] if weights else [1.0 if ways else None for ways in component.counts]
+		if weight is None:
+			# The mine count cannot be met, a flag is wrong
+			return analysis.setInconsistent()
+		possible = [k for k, w in enumerate(weight) if w is not None]
+		total = sum(component.counts[k] * weight[k] for k in possible)
+		for j, cell in enumerate(component.variables):
+			tallies = [component.cellCounts[k][j] for k in possible]
+			analysis.probabilities[cell] = sum(tally * weight[k] for tally, k in zip(tallies, possible)) / total
+			if not any(tallies):
+				analysis.safe.add(cell)
+			elif all(tally == component.counts[k] for tally, k in zip(tallies, possible)):
+				analysis.mines.add(cell)
+
+	if not interior:
+		return analysis
+
+	if weights is None:
+		expected = sum(analysis.probabilities.values())
+		analysis.interiorProbability = min(1.0, max(0.0, (remaining - expected) / interior))
+		return analysis
+
+	distribution = [1]
+	for component in components:
+		distribution = convolve(distribution, component.counts)
+	# Mines left for the interior, with the log weight of each possibility
+	outcomes = [
+		(remaining - s, log(ways) + logChoose(interior, remaining - s))
+		for s, ways in enumerate(distribution)
+		if ways and logChoose(interior, remaining - s) is not None
+	]
+	if not outcomes:
+		# No mine count left for the interior fits the components
+		return analysis.setInconsistent()
+	relative = normalize([weight for _, weight in outcomes])
+	analysis.interiorProbability = sum(mines * w for (mines, _), w in zip(outcomes, relative)) / (interior * sum(relative))
+	left = {mines for mines, _ in outcomes}
+	if left == {0} or left == {interior}:
+		variables = set().union(*(component.variables for component in components))
+		cells = analysis.safe if left == {0} else analysis.mines
+		for index in range(len(board.revealed)):
+			if not board.revealed[index] and not board.flags[index] and index not in variables:
+				cells.add(index)
+
+	return analysis
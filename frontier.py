@@ -0,0 +1,111 @@
+class Frontier():
+	"""
+	Live index of the revealed numbered cells that still touch hidden, unflagged cells \n
+	The Board updates it on every reveal and flag, so readers never have to
+	rescan the board. Cells are board indexes (row * width + col)
+	"""
+	def __init__(self, board):
+		self.board = board
+		# index -> set of hidden, unflagged neighbors
+		self.hidden = {}
+		# index -> number of flagged neighbors
+		self.flags = {}
+		# Entries changed since the last call to takeDirty
+		self.dirty = set()
+		# Entries added while Solver.walkFrontier runs, None otherwise
+		self.added = None
+
+	def copy(self, board):
+		frontier = Frontier(board)
+		frontier.hidden = {index: set(hidden) for index, hidden in self.hidden.items()}
+		frontier.flags = dict(self.flags)
+		frontier.dirty = set(self.dirty)
+		return frontier
+
+	def __contains__(self, index):
+		return index in self.hidden
+
+	def __len__(self):
+		return len(self.hidden)
+
+	def getHidden(self, index):
+		return self.hidden.get(index, set())
+
+	def getFlags(self, index):
+		if index in self.flags:
+			return self.flags[index]
+		flags = self.board.flags
+		return sum(flags[neighbor] for neighbor in self.board.layout.neighbors(index))
+
+	def getRemaining(self, index):
+		return self.board.counts[index] - self.flags.get(index, 0)
+
+	def takeDirty(self):
+		"""Return the entries changed since the previous call"""
+		dirty = self.dirty
+		self.dirty = set()
+		return dirty
+
+	def reveal(self, index):
+		for neighbor in self.board.layout.neighbors(index):
+			hidden = self.hidden.get(neighbor)
+			if hidden is None:
+				continue
+			hidden.discard(index)
+			self.dirty.add(neighbor)
+			if not hidden:
+				self.remove(neighbor)
+		self.track(index)
+
+	def track(self, index, zero=False):
+		"""
+		Add the revealed cell at index when it is a number with hidden neighbors left \n
+		Zeros are skipped since the flood fill reveals their neighbors, zero=True
+		keeps them for boards loaded from elsewhere
+		"""
+		board = self.board
+		if board.mines[index] or not (board.counts[index] or zero):
+			return
+		hidden = set()
+		flags = 0
+		for neighbor in board.layout.neighbors(index):
+			if not board.revealed[neighbor]:
+				if board.flags[neighbor]:
+					flags += 1
+				else:
+					hidden.add(neighbor)
+		if hidden:
+			self.hidden[index] = hidden
+			self.flags[index] = flags
+			self.dirty.add(index)
+			if self.added is not None:
+				self.added.append(index)
+
+	def toggleFlag(self, index):
+		"""
+		Entries only live while they have hidden neighbors, flagging the last
+		one drops the entry and unflagging it brings the entry back
+		"""
+		board = self.board
+		flagged = board.flags[index]
+		for neighbor in board.layout.neighbors(index):
+			hidden = self.hidden.get(neighbor)
+			if hidden is None:
+				if not flagged and board.revealed[neighbor]:
+					self.track(neighbor)
+				continue
+			if flagged:
+				hidden.discard(index)
+				self.flags[neighbor] += 1
+				if not hidden:
+					self.remove(neighbor)
+					continue
+			else:
+				hidden.add(index)
+				self.flags[neighbor] -= 1
+			self.dirty.add(neighbor)
+
+	def remove(self, index):
+		del self.hidden[index]
+		del self.flags[index]
+		self.dirty.discard(index)
@@ -1,116 +1,216 @@
+import argparse
 import pygame
 import os
 import time
+from collections import deque
 
 from board import Board
 from board import BoardBis
 from cell import Cell
-from solver import Solver
-from check import Check
+import tiles
+from solver import FLAG, Solver
+from subsets import SubsetStore
 
 class Game():
-	def __init__(self, board, screenSize):
+	def __init__(self, board, screenSize, fps=60, movesPerFrame=10, record=False):
 		self.board = board
 		self.screenSize = screenSize
 		self.cellSize = self.screenSize[0] // self.board.getSize()[1], self.screenSize[1] // self.board.getSize()[0]
+		self.fps = fps
+		# Solver moves waiting to be shown, at most movesPerFrame are applied each frame
+		self.moves = deque()
+		self.movesPerFrame = movesPerFrame
+		# Every solver move when recording, replay() plays them back
+		self.recording = [] if record else None
+		self.started = False
+		# Subsets found by the T key, kept for the Y and U keys until the board changes
+		self.subsets = SubsetStore()
 		self.loadImages()
+		self.clearScreen()
 
 	def run(self):
 		pygame.init()
-		icon = pygame.image.load('images/flag.png')
+		icon = pygame.image.load(os.path.join(tiles.IMAGES, 'flag.png'))
 		pygame.display.set_icon(icon)
 		pygame.display.set_caption('Minesweeper solver')
 		self.screen = pygame.display.set_mode(self.screenSize)
+		clock = pygame.time.Clock()
 		running = True
-		started = False
 
 		while running:
 			for event in pygame.event.get():
 				if event.type == pygame.QUIT:
 					running = False
+				if event.type == pygame.VIDEOEXPOSE:
+					self.clearScreen()
 				if event.type == pygame.MOUSEBUTTONDOWN:
 					button = event.button
 					if button == 1 or button == 3:
 						position = pygame.mouse.get_pos()
-						if started == False:
+						if self.started == False:
 							self.board.setBombs(self.getIndex(position))
-							solver = Solver(self.board, self.draw)
-							started = True
+							self.started = True
 						flag = True if button == 3 else False
+						self.playMoves()
 						self.handleClick(position, flag)
 				if event.type == pygame.KEYDOWN:
 					if event.key == pygame.K_r:
-						self.board = Board(self.board.getSize(), self.board.getNbBombs())
-						started = False
+						self.setBoard(Board(self.board.getSize(), self.board.getNbBombs()))
 					if event.key == pygame.K_s:
-						canSolve = solver.solve()
+						canSolve = self.getSolver().solve()
 						if canSolve:
 							print('No guess')
 						else:
 							print('Guess')
 					if event.key == pygame.K_c:
-						if not solver.solve():
+						if not self.getSolver().solve():
+							self.playMoves()
+							# The automation backends are only loaded when they are used
+							from check import Check
 							check = Check(self.board)
 							check.checkBoard()
 					if event.key == pygame.K_a:
-						self.board = BoardBis(self.board.getSize(), self.board.getNbBombs())
-						started = False
+						self.setBoard(BoardBis(self.board.getSize(), self.board.getNbBombs()))
 					if event.key == pygame.K_t:
-						solver.basicDeduction()
+						self.getStepSolver().basicDeduction()
 					if event.key == pygame.K_y:
-						solver.advancedLogic()
+						self.getStepSolver().advancedLogic()
 					if event.key == pygame.K_u:
-						solver.mineCountLogic()
+						self.getStepSolver().mineCountLogic()
+					# Before the first click no mine is placed and every cell looks safe
+					if event.key == pygame.K_g and self.started:
+						self.getSolver().guessLogic()
 
+			self.playMoves(self.movesPerFrame)
 			self.draw()
 			if self.board.getWon():
+				# The solver often queues its last flags after the winning reveal, show them first
+				self.playMoves()
+				self.draw()
 				print('you won')
 				time.sleep(.5)
-				self.board = Board(self.board.getSize(), self.board.getNbBombs())
-				started = False
+				self.setBoard(Board(self.board.getSize(), self.board.getNbBombs()))
+			clock.tick(self.fps)
 		pygame.quit()
 
+	def setBoard(self, board):
+		"""Start a new game on board, moves queued for the previous one are dropped"""
+		self.board = board
+		self.moves.clear()
+		self.started = False
+		self.subsets = SubsetStore()
+		self.clearScreen()
+
+	def getSolver(self):
+		"""
+		Return a solver working on a copy of the board \n
+		It runs at full speed and its moves are queued, the game applies
+		them to the shown board a few per frame
+		"""
+		self.playMoves()
+		return Solver(self.board.copy(), listener=self.queueMove)
+
+	def getStepSolver(self):
+		"""
+		Heuristic solver for the keys running a single rule \n
+		Every solver shares the game's subsets, so the ones basicDeduction
+		finds are still there for advancedLogic and mineCountLogic
+		"""
+		solver = self.getSolver()
+		solver.exact = False
+		solver.confirmed_bomb_subsets = self.subsets
+		return solver
+
+	def queueMove(self, move):
+		self.moves.append(move)
+		if self.recording is not None:
+			self.recording.append(move)
+
+	def replay(self, moves):
+		"""Queue a recorded move stream to be played back on the current board"""
+		self.moves.extend(moves)
+
+	def playMoves(self, limit=None):
+		"""Apply up to limit queued moves, all of them by default"""
+		played = 0
+		while self.moves and (limit is None or played < limit):
+			move = self.moves.popleft()
+			cell = self.board.getCell(move.position[0], move.position[1])
+			self.applyClick(cell, move.action == FLAG)
+			played += 1
+
+	def applyClick(self, cell: Cell, flag):
+		"""Click on the board and mark the cells it changed for the next draw"""
+		revealed = self.board.handleClick(cell, flag)
+		# A flag toggle only changes the clicked cell
+		self.dirty.add(cell.index)
+		self.dirty.update(self.board.getIndex(row, col) for row, col in revealed)
+
+	def clearScreen(self):
+		"""Forget what is on screen so the next draw repaints every cell"""
+		self.shown = [None] * (self.board.getSize()[0] * self.board.getSize()[1])
+		self.shownLost = False
+		self.dirty = set()
+		self.repaint = True
+
 	def draw(self):
-		topLeft = (0, 0)
-		for row in range(self.board.getSize()[0]):
-			for col in range(self.board.getSize()[1]):
-				cell = self.board.getCell(row, col)
-				image = self.getImage(cell)
-				self.screen.blit(image, topLeft)
-				topLeft = topLeft[0] + self.cellSize[0], topLeft[1]
-			topLeft = 0, topLeft[1] + self.cellSize[1]
-		pygame.display.flip()
+		"""
+		Blit only the cells changed since the last draw \n
+		Every cell is compared after clearScreen and when the game is lost,
+		which uncovers the bombs and the wrong flags at once
+		"""
+		if self.repaint or self.board.getLost() != self.shownLost:
+			indexes = range(len(self.shown))
+			self.repaint = False
+			self.shownLost = self.board.getLost()
+		else:
+			indexes = self.dirty
+		rects = []
+		width = self.board.getSize()[1]
+		for index in indexes:
+			string = self.getTileName(index)
+			if self.shown[index] == string:
+				continue
+			self.shown[index] = string
+			row, col = divmod(index, width)
+			topLeft = col * self.cellSize[0], row * self.cellSize[1]
+			rects.append(self.screen.blit(self.images[string], topLeft))
+		self.dirty = set()
+		if rects:
+			pygame.display.update(rects)
 
 	def getImage(self, cell: Cell):
-		string = 'empty-block'
-		if cell.getIsClicked():
-			string = 'bomb-at-clicked-block' if cell.getHasBomb() else str(cell.getNumAround())
-		if cell.getHasFlag():
-			string = 'flag'
-
-		
-		if self.board.getLost():
-			if cell.getHasBomb() and not cell.getIsClicked():
-				string = 'unclicked-bomb'
-			if cell.getHasFlag() and not cell.getHasBomb():
-				string = 'wrong-flag'
+		return self.images[self.getTileName(cell.index)]
 
-		return self.images[string]
+	def getTileName(self, index):
+		return tiles.getTileName(self.board, index)
 
 	def loadImages(self):
-		self.images = {}
-		for fileName in os.listdir('images'):
-			image = pygame.image.load(f'images/{fileName}')
-			image = pygame.transform.scale(image, self.cellSize)
-			self.images[fileName.split('.')[0]] = image
+		self.images = tiles.loadTiles(self.cellSize)
 
 	def handleClick(self, position, flag):
 		if self.board.getLost():
 			return
 		index = self.getIndex(position)
 		cell = self.board.getCell(index[0], index[1])
-		self.board.handleClick(cell, flag)
+		self.applyClick(cell, flag)
 
 	def getIndex(self, position):
 		return position[1] // self.cellSize[1], position[0] // self.cellSize[0]
-	
\ No newline at end of file
+	
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Play in a window, with the solver a key press away')
+	parser.add_argument('--size', type=int, nargs=2, default=(9, 10), metavar=('ROWS', 'COLS'))
+	parser.add_argument('--bombs', type=int, default=15)
+	parser.add_argument('--cell-size', type=int, default=50, help='tile size in pixels')
+	parser.add_argument('--seed', type=int, default=None)
+	args = parser.parse_args(argv)
+
+	size = tuple(args.size)
+	board = Board(size, args.bombs, args.seed)
+	Game(board, (size[1] * args.cell_size, size[0] * args.cell_size)).run()
+
+
+if __name__ == '__main__':
+	main()
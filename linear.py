@@ -0,0 +1,85 @@
+from math import gcd
+
+import csp
+
+
+def normalize(coefficients, constant):
+	divisor = gcd(constant, *coefficients.values())
+	if divisor > 1:
+		coefficients = {cell: value // divisor for cell, value in coefficients.items()}
+		constant //= divisor
+	return coefficients, constant
+
+
+def eliminate(row, pivot, cell):
+	"""Cancel cell out of row using the pivot row, keeping every coefficient an integer"""
+	factor = row[0].get(cell)
+	if not factor:
+		return row
+	scale = pivot[0][cell]
+	coefficients = {other: value * scale for other, value in row[0].items()}
+	for other, value in pivot[0].items():
+		coefficients[other] = coefficients.get(other, 0) - value * factor
+		if not coefficients[other]:
+			del coefficients[other]
+	return normalize(coefficients, row[1] * scale - pivot[1] * factor)
+
+
+def reduceRows(rows):
+	"""Gauss-Jordan elimination over sparse integer rows of ({cell: coefficient}, constant)"""
+	pending = list(rows)
+	reduced = []
+	for cell in sorted(set().union(*(row[0] for row in rows))):
+		pivot = next((row for row in pending if cell in row[0]), None)
+		if pivot is None:
+			continue
+		pending.remove(pivot)
+		pending = [eliminate(row, pivot, cell) for row in pending]
+		reduced = [eliminate(row, pivot, cell) for row in reduced]
+		reduced.append(pivot)
+	return reduced
+
+
+def boundRow(coefficients, constant, safe, mines):
+	"""
+	Every cell is 0 or 1, so a row can only reach its constant at the
+	extreme of its range when every cell takes its extreme value
+	"""
+	highest = sum(value for value in coefficients.values() if value > 0)
+	lowest = sum(value for value in coefficients.values() if value < 0)
+	if constant == highest:
+		positive, negative = mines, safe
+	elif constant == lowest:
+		positive, negative = safe, mines
+	else:
+		return
+	for cell, value in coefficients.items():
+		(positive if value > 0 else negative).add(cell)
+
+
+def deduce(board):
+	"""
+	Row reduce the frontier constraints of the board and return the
+	(safe, mines) board indexes forced by the 0/1 bounds \n
+	When no hidden cell is left outside the frontier the mine count is
+	added as one more row
+	"""
+	constraints = csp.getConstraints(board.frontier)
+	safe = set()
+	mines = set()
+	if not constraints:
+		return safe, mines
+
+	constrained = set().union(*(cells for cells, _ in constraints))
+	interior = len(board.revealed) - board.numClicked - board.flagged - len(constrained)
+	if interior:
+		groups = csp.splitComponents(constraints)
+	else:
+		groups = [constraints + [(frozenset(constrained), board.getFlagToFind())]]
+
+	for group in groups:
+		rows = [({cell: 1 for cell in cells}, count) for cells, count in group]
+		for coefficients, constant in reduceRows(rows):
+			if coefficients:
+				boundRow(coefficients, constant, safe, mines)
+	return safe, mines
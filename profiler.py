@@ -0,0 +1,58 @@
+import json
+import time
+
+
+class Profiler():
+	"""
+	Opt-in instrumentation for Solver \n
+	Counts how often each rule is entered, the wall time spent in it and the
+	cells it resolved, in total and per solve() iteration. Iteration i adds
+	up the i-th pass of every solve() the profiler watched, so one profiler
+	can be shared by many games without growing
+	"""
+	def __init__(self):
+		self.rules = {}
+		self.iterations = []
+		self.iteration = 0
+		self.rule = None
+		self.started = 0.0
+
+	def record(self, rule, field, value):
+		while len(self.iterations) <= self.iteration:
+			self.iterations.append({})
+		for table in (self.rules, self.iterations[self.iteration]):
+			stats = table.setdefault(rule, {'calls': 0, 'time': 0.0, 'cells': 0})
+			stats[field] += value
+
+	def switch(self, rule):
+		"""Charge the time since the last switch to the running rule and start the next one"""
+		now = time.perf_counter()
+		if self.rule is not None:
+			self.record(self.rule, 'time', now - self.started)
+		self.rule = rule
+		self.started = now
+		if rule is not None:
+			self.record(rule, 'calls', 1)
+
+	def resolved(self, cells=1):
+		if self.rule is not None:
+			self.record(self.rule, 'cells', cells)
+
+	def startSolve(self):
+		self.iteration = 0
+
+	def nextIteration(self):
+		self.iteration += 1
+
+	def report(self):
+		return {'rules': self.rules, 'iterations': self.iterations}
+
+	def save(self, path):
+		with open(path, 'w') as file:
+			json.dump(self.report(), file, indent=2)
+
+	def summary(self):
+		lines = [f'{"rule":<42}{"calls":>10}{"time (ms)":>14}{"cells":>10}']
+		for rule, stats in sorted(self.rules.items(), key=lambda item: -item[1]['time']):
+			lines.append(f'{rule:<42}{stats["calls"]:>10}{stats["time"] * 1000:>14.3f}{stats["cells"]:>10}')
+		return '\n'.join(lines)
@@ -0,0 +1,87 @@
+import numpy as np
+import pygame
+
+import tiles
+from board import Board
+
+# Every tile is reduced to a GRID x GRID grid of mean colors
+GRID = 8
+# Pixels averaged per grid square and axis
+SAMPLES = 4
+
+
+def toArray(image):
+	"""(height, width, 3) array of a pygame Surface, arrays are returned as they are"""
+	if isinstance(image, pygame.Surface):
+		return pygame.surfarray.array3d(image).transpose(1, 0, 2)
+	return np.asarray(image)[:, :, :3]
+
+
+def flatten(image):
+	"""The tile as it looks once blitted on the black window background"""
+	surface = pygame.Surface(image.get_size())
+	surface.blit(image, (0, 0))
+	return surface
+
+
+class Recognizer():
+	"""
+	Classify every cell of a screenshot by its nearest tile of images/ \n
+	Tiles and cells are compared through fingerprints, the mean color of a
+	GRID x GRID grid over the cell, so a whole screenshot is one gather and
+	one matrix product against the precomputed tile fingerprints
+	"""
+	def __init__(self, cellSize, directory=tiles.IMAGES):
+		self.cellSize = tuple(cellSize)
+		images = tiles.loadTiles(self.cellSize, directory)
+		self.names = list(images)
+		self.fingerprints = np.concatenate([self.fingerprint(toArray(flatten(images[name])), (1, 1)) for name in self.names])
+		self.norms = (self.fingerprints ** 2).sum(axis=1)
+
+	def fingerprint(self, image, size):
+		"""(rows * cols, GRID * GRID * 3) fingerprints of the cells of image"""
+		rows, cols = size
+		width, height = self.cellSize
+		points = GRID * SAMPLES
+		offsetsY = ((np.arange(points) + 0.5) * height / points).astype(np.intp)
+		offsetsX = ((np.arange(points) + 0.5) * width / points).astype(np.intp)
+		pixelsY = (np.arange(rows)[:, None] * height + offsetsY[None, :]).reshape(-1)
+		pixelsX = (np.arange(cols)[:, None] * width + offsetsX[None, :]).reshape(-1)
+
+		samples = image[pixelsY[:, None], pixelsX[None, :]].astype(np.float32)
+		samples = samples.reshape(rows, GRID, SAMPLES, cols, GRID, SAMPLES, 3).mean(axis=(2, 5))
+		return samples.transpose(0, 2, 1, 3, 4).reshape(rows * cols, GRID * GRID * 3)
+
+	def classify(self, image, size):
+		"""Tile name of every cell, in board order"""
+		cells = self.fingerprint(toArray(image), size)
+		distances = self.norms[None, :] - 2 * cells @ self.fingerprints.T
+		return [self.names[tile] for tile in distances.argmin(axis=1)]
+
+	def read(self, image, size, nbBombs):
+		"""Board holding the visible state of the screenshot, see Board.loadView"""
+		names = self.classify(image, size)
+		revealed = bytearray(len(names))
+		counts = bytearray(len(names))
+		flags = bytearray(len(names))
+		for index, name in enumerate(names):
+			if name in ('flag', 'wrong-flag'):
+				flags[index] = 1
+			elif name[0].isdigit():
+				revealed[index] = 1
+				counts[index] = int(name[0])
+
+		board = Board(size, nbBombs, 0)
+		board.loadView(revealed, counts, flags)
+		return board
+
+
+def render(board: Board, cellSize, images=None):
+	"""Draw the board with the tiles Game uses onto a new Surface, for offline tests of the recognizer"""
+	images = images or tiles.loadTiles(cellSize)
+	rows, cols = board.getSize()
+	surface = pygame.Surface((cols * cellSize[0], rows * cellSize[1]))
+	for index in range(rows * cols):
+		row, col = divmod(index, cols)
+		surface.blit(images[tiles.getTileName(board, index)], (col * cellSize[0], row * cellSize[1]))
+	return surface
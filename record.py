@@ -0,0 +1,151 @@
+import mmap
+import struct
+
+from board import Board
+from solver import FLAG, REVEAL, Move
+
+# File layout: MAGIC, then records back to back. Each record is
+#   length     uint32  bytes of the record after this field
+#   header     HEADER  rows, cols, bombs, seed, first click row and col, outcome, move count
+#   mines      one bit per cell, row * width + col, least significant bit first
+#   moves      MOVE per move: cell index << 1 | 1 for a flag, rule code
+MAGIC = b'MSGR\x01'
+LENGTH = struct.Struct('<I')
+HEADER = struct.Struct('<HHIqHHBI')
+MOVE = struct.Struct('<IB')
+
+# Codes are stored in files, only ever append to these lists
+OUTCOMES = [None, 'win', 'loss', 'guess']
+RULES = [
+	None, 'basicDeduction', 'advancedLogic', 'advancedLogic.sharedArea', 'advancedLogic.neighborSubset',
+	'advancedLogic.neighborConfirmedSubsets', 'advancedLogic.confirmedSubsets', 'advancedLogic.overflow',
+	'prune_confirmed_subsets', 'mineCountLogic', 'singleBombLogic', 'exactLogic', 'linearLogic', 'guessLogic',
+]
+RULE_CODES = {rule: code for code, rule in enumerate(RULES)}
+
+_toBits = bytes.maketrans(b'\x00\x01', b'01')
+_fromBits = bytes.maketrans(b'01', b'\x00\x01')
+
+
+def packMines(mines):
+	"""Pack a bytearray of 0/1 into one bit per cell"""
+	if not mines:
+		return b''
+	bits = int(bytes(mines).translate(_toBits)[::-1], 2)
+	return bits.to_bytes((len(mines) + 7) // 8, 'little')
+
+
+def unpackMines(bitmap, cells):
+	bits = int.from_bytes(bitmap, 'little')
+	return bytearray(format(bits, f'0{cells}b')[::-1].encode().translate(_fromBits)[:cells])
+
+
+class GameRecord():
+	def __init__(self, size, nbBombs, seed, firstClick, mines, moves, outcome=None):
+		self.size = size
+		self.nbBombs = nbBombs
+		self.seed = seed
+		self.firstClick = firstClick
+		self.mines = mines
+		self.moves = moves
+		self.outcome = outcome
+
+	def toBoard(self, played=False):
+		"""
+		Rebuild the board with the recorded mines, without going through setBombs \n
+		With played=True the first click and every move are applied as well
+		"""
+		board = Board(self.size, self.nbBombs, self.seed)
+		board.loadMines(self.mines)
+		if played:
+			board.handleClick(board.getCell(self.firstClick[0], self.firstClick[1]), False)
+			for move in self.moves:
+				board.handleClick(board.getCell(move.position[0], move.position[1]), move.action == FLAG)
+		return board
+
+
+class RecordWriter():
+	"""Append game records to a file as they are produced"""
+	def __init__(self, path):
+		self.file = open(path, 'wb')
+		self.file.write(MAGIC)
+		self.count = 0
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+	def close(self):
+		self.file.close()
+
+	def write(self, board: Board, firstClick, moves, outcome=None):
+		width = board.getSize()[1]
+		header = HEADER.pack(
+			board.getSize()[0], width, board.getNbBombs(), board.seed,
+			firstClick[0], firstClick[1], OUTCOMES.index(outcome), len(moves),
+		)
+		body = bytearray(header)
+		body += packMines(board.mines)
+		for move in moves:
+			index = move.position[0] * width + move.position[1]
+			body += MOVE.pack(index << 1 | (move.action == FLAG), RULE_CODES.get(move.rule, 0))
+		self.file.write(LENGTH.pack(len(body)))
+		self.file.write(body)
+		self.count += 1
+
+
+class RecordReader():
+	"""
+	Memory-mapped reader over a record file \n
+	Records are decoded one at a time, scan() only reads the headers
+	"""
+	def __init__(self, path):
+		self.file = open(path, 'rb')
+		self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+		if self.map[:len(MAGIC)] != MAGIC:
+			self.close()
+			raise ValueError(f'{path} is not a game record file')
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+	def close(self):
+		self.map.close()
+		self.file.close()
+
+	def offsets(self):
+		offset = len(MAGIC)
+		end = len(self.map)
+		while offset < end:
+			length, = LENGTH.unpack_from(self.map, offset)
+			yield offset + LENGTH.size
+			offset += LENGTH.size + length
+
+	def scan(self):
+		"""Yield (size, nbBombs, seed, firstClick, outcome, moveCount) without decoding mines or moves"""
+		for offset in self.offsets():
+			rows, cols, bombs, seed, row, col, outcome, moveCount = HEADER.unpack_from(self.map, offset)
+			yield (rows, cols), bombs, seed, (row, col), OUTCOMES[outcome], moveCount
+
+	def __iter__(self):
+		for offset in self.offsets():
+			yield self.readAt(offset)
+
+	def readAt(self, offset):
+		rows, cols, bombs, seed, row, col, outcome, moveCount = HEADER.unpack_from(self.map, offset)
+		offset += HEADER.size
+		cells = rows * cols
+		bitmapSize = (cells + 7) // 8
+		mines = unpackMines(self.map[offset:offset + bitmapSize], cells)
+		offset += bitmapSize
+
+		moves = []
+		for value, rule in MOVE.iter_unpack(self.map[offset:offset + moveCount * MOVE.size]):
+			action = FLAG if value & 1 else REVEAL
+			moves.append(Move(action, divmod(value >> 1, cols), RULES[rule] if rule < len(RULES) else None))
+		return GameRecord((rows, cols), bombs, seed, (row, col), mines, moves, OUTCOMES[outcome])
@@ -0,0 +1,140 @@
+import argparse
+import json
+import sys
+
+import csp
+import linear
+from board import Board
+from solver import Solver
+
+HIDDEN = '?'
+FLAGGED = 'F'
+
+
+def parseBoard(line):
+	"""
+	Board and id of one input line, either JSON or compact text \n
+	JSON: {"id": ..., "bombs": 10, "rows": ["??1", ...]}, id is optional \n
+	Text: the bomb count then the rows separated by '/', '10 ??1/?21/...' \n
+	Rows hold '?' for a hidden cell, 'F' for a flag and 0-8 for a revealed number
+	"""
+	line = line.strip()
+	if line.startswith('{'):
+		data = json.loads(line)
+		if not isinstance(data, dict) or 'bombs' not in data or 'rows' not in data:
+			raise ValueError('a JSON board needs bombs and rows')
+		key, bombs, rows = data.get('id'), data['bombs'], data['rows']
+	else:
+		bombs, text = line.split(None, 1)
+		key, rows = None, text.split('/')
+		bombs = int(bombs)
+	# bool is an int too, and 1.5 or 1e400 must not be rounded into a count
+	if not isinstance(bombs, int) or isinstance(bombs, bool) or bombs < 0:
+		raise ValueError(f'bombs must be a non negative integer, not {bombs!r}')
+	if not isinstance(rows, list) or not rows or not all(isinstance(row, str) for row in rows):
+		raise ValueError('rows must be a non empty list of strings')
+
+	width = len(rows[0])
+	if not width or any(len(row) != width for row in rows):
+		raise ValueError('rows must all have the same length')
+	cells = ''.join(rows)
+	revealed = bytearray(len(cells))
+	counts = bytearray(len(cells))
+	flags = bytearray(len(cells))
+	for index, char in enumerate(cells):
+		if char == FLAGGED:
+			flags[index] = 1
+		elif char.isdigit() and char != '9':
+			revealed[index] = 1
+			counts[index] = int(char)
+		elif char != HIDDEN:
+			raise ValueError(f'unknown cell {char!r}')
+
+	board = Board((len(rows), width), bombs, 0)
+	board.loadView(revealed, counts, flags)
+	return key, board
+
+
+def isConsistent(board):
+	"""
+	Every revealed number sees no more flags than its count and enough
+	hidden cells to hold the rest \n
+	The frontier drops the numbers without hidden neighbors, so a wrong flag
+	around them would never reach the constraint solver
+	"""
+	for index in range(len(board.revealed)):
+		if not board.revealed[index]:
+			continue
+		flags = hidden = 0
+		for neighbor in board.layout.neighbors(index):
+			if board.flags[neighbor]:
+				flags += 1
+			elif not board.revealed[neighbor]:
+				hidden += 1
+		if not flags <= board.counts[index] <= flags + hidden:
+			return False
+	return True
+
+
+def solveBoard(board, probabilities=True):
+	"""
+	Safe cells, mines and the mine probability of every hidden cell, without
+	clicking anything \n
+	Return None when no mine arrangement fits the board
+	"""
+	if not isConsistent(board):
+		return None
+	analysis = csp.analyze(board)
+	if not analysis.consistent:
+		return None
+	safe, mines = linear.deduce(board)
+	safe |= analysis.safe
+	mines |= analysis.mines
+	if safe & mines:
+		return None
+	chances = Solver(board).probabilities(analysis)
+
+	result = {
+		'safe': [list(board.getPosition(index)) for index in sorted(safe)],
+		'mines': [list(board.getPosition(index)) for index in sorted(mines)],
+		'exact': analysis.exact,
+	}
+	if probabilities:
+		result['probabilities'] = [[row, col, round(chance, 6)] for (row, col), chance in chances.items()]
+	return result
+
+
+def serve(input, output, probabilities=True):
+	"""Answer every input line with one JSON line, boards are read and dropped one at a time"""
+	for number, line in enumerate(input, 1):
+		if not line.strip():
+			continue
+		try:
+			key, board = parseBoard(line)
+			result = solveBoard(board, probabilities)
+		except Exception as error:
+			# Whatever a line holds, it must never end the stream
+			result = {'line': number, 'error': str(error) or type(error).__name__}
+		else:
+			if result is None:
+				result = {'line': number, 'error': 'inconsistent board'}
+			if key is not None:
+				result['id'] = key
+			result['line'] = number
+		output.write(json.dumps(result) + '\n')
+		output.flush()
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(
+		description='Read boards from stdin, one per line, and write what the solver deduces to stdout as JSON lines',
+		epilog=parseBoard.__doc__,
+		formatter_class=argparse.RawDescriptionHelpFormatter,
+	)
+	parser.add_argument('--no-probabilities', action='store_true', help='only report the safe cells and the mines')
+	args = parser.parse_args(argv)
+	serve(sys.stdin, sys.stdout, not args.no_probabilities)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,135 @@
+import argparse
+import random
+import time
+from typing import NamedTuple
+
+from board import Board
+from profiler import Profiler
+from record import RecordWriter
+from solver import Solver
+
+WIN = 'win'
+LOSS = 'loss'
+GUESS = 'guess'
+
+
+class GameResult(NamedTuple):
+	seed: int
+	outcome: str
+	guesses: int
+	duration: float
+
+
+class Stats():
+	def __init__(self):
+		self.games = 0
+		self.outcomes = {WIN: 0, LOSS: 0, GUESS: 0}
+		self.guesses = 0
+		self.totalTime = 0.0
+
+	def add(self, result: GameResult):
+		self.games += 1
+		self.outcomes[result.outcome] += 1
+		self.guesses += result.guesses
+		self.totalTime += result.duration
+
+	def getWinRate(self):
+		return self.outcomes[WIN] / self.games if self.games else 0.0
+
+	def getMeanTime(self):
+		return self.totalTime / self.games if self.games else 0.0
+
+	def report(self):
+		return (
+			f'games: {self.games}\n'
+			f'win rate: {self.getWinRate():.2%}\n'
+			f'wins: {self.outcomes[WIN]}  losses: {self.outcomes[LOSS]}  stopped at guess: {self.outcomes[GUESS]}\n'
+			f'guesses: {self.guesses}\n'
+			f'time per game: {self.getMeanTime() * 1000:.3f} ms'
+		)
+
+
+def getFirstClick(size, policy, seed):
+	"""
+	Return the first click position for a policy \n
+	'center', 'corner', 'random' (derived from the seed) or a (row, col) tuple
+	"""
+	match policy:
+		case 'center':
+			return size[0] // 2, size[1] // 2
+		case 'corner':
+			return 0, 0
+		case 'random':
+			rng = random.Random(seed)
+			return rng.randrange(size[0]), rng.randrange(size[1])
+	return tuple(policy)
+
+
+def playGame(size, nbBombs, seed, firstClick='center', guess=False, exact=True, profiler=None, writer=None):
+	"""
+	Play one seeded game until it is won, lost or needs a guess \n
+	With guess=True the solver takes the safest guess and plays on, with a
+	RecordWriter the game and its moves are appended to the record file
+	"""
+	start = time.perf_counter()
+	board = Board(size, nbBombs, seed)
+	position = getFirstClick(size, firstClick, seed)
+	board.setBombs(position)
+	board.handleClick(board.getCell(position[0], position[1]), False)
+
+	moves = []
+	solver = Solver(board, exact=exact, guess=guess, profiler=profiler, listener=moves.append if writer else None)
+	solver.solve()
+
+	if board.getLost():
+		outcome = LOSS
+	elif board.getWon():
+		outcome = WIN
+	else:
+		outcome = GUESS
+	if writer:
+		writer.write(board, position, moves, outcome)
+	return GameResult(seed, outcome, solver.guesses, time.perf_counter() - start)
+
+
+def runSimulation(size, nbBombs, seeds, firstClick='center', guess=False, exact=True, profiler=None, writer=None):
+	stats = Stats()
+	for seed in seeds:
+		stats.add(playGame(size, nbBombs, seed, firstClick, guess, exact, profiler, writer))
+	return stats
+
+
+def parseFirstClick(value):
+	if value in ('center', 'corner', 'random'):
+		return value
+	row, col = value.split(',')
+	return int(row), int(col)
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Run the solver over seeded boards without a window')
+	parser.add_argument('--size', type=int, nargs=2, default=(16, 16), metavar=('ROWS', 'COLS'))
+	parser.add_argument('--bombs', type=int, default=40)
+	parser.add_argument('--seeds', type=int, nargs=2, default=(0, 1000), metavar=('START', 'STOP'))
+	parser.add_argument('--first-click', type=parseFirstClick, default='center', help="center, corner, random or 'row,col'")
+	parser.add_argument('--guess', action='store_true', help='guess the safest cell instead of stopping')
+	parser.add_argument('--legacy', action='store_true', help='use the heuristic rules instead of the exact solver')
+	parser.add_argument('--profile', metavar='FILE', help='time every solver rule and write the report as JSON')
+	parser.add_argument('--record', metavar='FILE', help='write every game and its moves to a binary record file')
+	args = parser.parse_args(argv)
+
+	profiler = Profiler() if args.profile else None
+	writer = RecordWriter(args.record) if args.record else None
+	try:
+		stats = runSimulation(tuple(args.size), args.bombs, range(*args.seeds), args.first_click, args.guess, not args.legacy, profiler, writer)
+	finally:
+		if writer:
+			writer.close()
+	print(stats.report())
+	if profiler:
+		print(profiler.summary())
+		profiler.save(args.profile)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,70 @@
+class SubsetStore():
+	"""
+	Confirmed (cells, bombs) subsets, indexed by member cell \n
+	Lookups only visit the subsets sharing a cell with the query instead of
+	scanning every stored subset
+	"""
+	def __init__(self):
+		self.subsets = set()
+		self.byCell = {}
+
+	def __len__(self):
+		return len(self.subsets)
+
+	def __iter__(self):
+		return iter(self.subsets)
+
+	def __contains__(self, subset):
+		return subset in self.subsets
+
+	def add(self, subset):
+		if subset in self.subsets:
+			return
+		self.subsets.add(subset)
+		for cell in subset[0]:
+			self.byCell.setdefault(cell, set()).add(subset)
+
+	def remove(self, subset):
+		self.subsets.remove(subset)
+		for cell in subset[0]:
+			entries = self.byCell[cell]
+			entries.discard(subset)
+			if not entries:
+				del self.byCell[cell]
+
+	def clear(self):
+		self.subsets.clear()
+		self.byCell.clear()
+
+	def touching(self, cells):
+		"""Subsets sharing at least one cell with cells"""
+		found = set()
+		for cell in cells:
+			found.update(self.byCell.get(cell, ()))
+		return found
+
+	def containedIn(self, cells):
+		"""Subsets whose cells all belong to cells"""
+		cells = frozenset(cells)
+		return [subset for subset in self.touching(cells) if subset[0] <= cells]
+
+	def containing(self, cells):
+		"""Subsets holding every one of cells"""
+		found = None
+		for cell in sorted(cells, key=lambda cell: len(self.byCell.get(cell, ()))):
+			entries = self.byCell.get(cell)
+			if not entries:
+				return set()
+			found = set(entries) if found is None else found & entries
+			if not found:
+				break
+		return found or set()
+
+	def prune(self):
+		"""Drop every subset holding a smaller one, of equal cell sets only the first visited stays"""
+		for subset in sorted(self.subsets, key=lambda subset: len(subset[0])):
+			if subset not in self.subsets:
+				continue
+			for other in self.containing(subset[0]):
+				if other != subset:
+					self.remove(other)
@@ -0,0 +1,106 @@
+import json
+import os
+
+import pygame
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+IMAGES = os.path.join(ROOT, 'images')
+# Scaled atlases saved by cell size, rebuilt when an image is newer
+CACHE = os.path.join(ROOT, '.tiles')
+
+# (directory, cellSize) -> (atlas, {name: subsurface})
+_atlases = {}
+
+
+def getTileName(board, index):
+	"""Name of the image in images/ showing the cell at index"""
+	string = 'empty-block'
+	if board.revealed[index]:
+		string = 'bomb-at-clicked-block' if board.mines[index] else str(board.counts[index])
+	if board.flags[index]:
+		string = 'flag'
+
+	if board.getLost():
+		if board.mines[index] and not board.revealed[index]:
+			string = 'unclicked-bomb'
+		if board.flags[index] and not board.mines[index]:
+			string = 'wrong-flag'
+
+	return string
+
+
+def getNames(directory):
+	return sorted(fileName.split('.')[0] for fileName in os.listdir(directory))
+
+
+def buildAtlas(cellSize, directory):
+	"""Scale every tile to cellSize and pack them side by side in name order"""
+	names = getNames(directory)
+	atlas = pygame.Surface((cellSize[0] * len(names), cellSize[1]), pygame.SRCALPHA)
+	fileNames = {fileName.split('.')[0]: fileName for fileName in os.listdir(directory)}
+	for i, name in enumerate(names):
+		image = pygame.image.load(os.path.join(directory, fileNames[name]))
+		# MAX over the transparent atlas copies the pixels and their alpha as they are
+		atlas.blit(pygame.transform.scale(image, cellSize), (i * cellSize[0], 0), special_flags=pygame.BLEND_RGBA_MAX)
+	return atlas
+
+
+def getCachePath(cellSize, directory):
+	if directory != IMAGES:
+		return None
+	return os.path.join(CACHE, f'atlas-{cellSize[0]}x{cellSize[1]}.png')
+
+
+def loadAtlas(cellSize, directory):
+	"""
+	Atlas from the disk cache when it holds the current tiles in the same
+	order and is newer than every image, built and saved otherwise \n
+	The tile order is saved next to the atlas, an image added or removed
+	since would shift every tile after it
+	"""
+	names = getNames(directory)
+	path = getCachePath(cellSize, directory)
+	manifest = path and os.path.splitext(path)[0] + '.json'
+	if path and os.path.exists(path) and os.path.exists(manifest):
+		newest = max(os.path.getmtime(os.path.join(directory, fileName)) for fileName in os.listdir(directory))
+		with open(manifest) as file:
+			cached = json.load(file)
+		if os.path.getmtime(path) >= newest and cached == names:
+			atlas = pygame.image.load(path)
+			if atlas.get_size() == (cellSize[0] * len(names), cellSize[1]):
+				return atlas
+
+	atlas = buildAtlas(cellSize, directory)
+	if path:
+		try:
+			os.makedirs(CACHE, exist_ok=True)
+			pygame.image.save(atlas, path)
+			with open(manifest, 'w') as file:
+				json.dump(names, file)
+		except (OSError, pygame.error):
+			pass
+	return atlas
+
+
+def loadTiles(cellSize, directory=IMAGES):
+	"""
+	Every tile scaled to cellSize, keyed by file name without extension \n
+	Tiles are subsurfaces of one atlas per cell size, kept in memory and on disk
+	"""
+	cellSize = tuple(cellSize)
+	key = (directory, cellSize)
+	if key not in _atlases:
+		atlas = loadAtlas(cellSize, directory)
+		tiles = {
+			name: atlas.subsurface(pygame.Rect(i * cellSize[0], 0, cellSize[0], cellSize[1]))
+			for i, name in enumerate(getNames(directory))
+		}
+		_atlases[key] = (atlas, tiles)
+	return _atlases[key][1]
+
+
+def getAtlas(cellSize, directory=IMAGES):
+	"""The atlas surface and the area of every tile in it"""
+	tiles = loadTiles(cellSize, directory)
+	atlas = _atlases[(directory, tuple(cellSize))][0]
+	return atlas, {name: pygame.Rect(tile.get_offset(), tile.get_size()) for name, tile in tiles.items()}
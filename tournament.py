@@ -0,0 +1,64 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from simulate import Stats, playGame, parseFirstClick
+
+# Number of board cells a single chunk should cover, so small boards get
+# long chunks and huge boards get short ones
+CHUNK_CELLS = 250_000
+MAX_CHUNK = 2000
+
+
+def getChunkSize(size, nbGames, workers):
+	"""Adapt the number of games per chunk to the board size and the pool size"""
+	chunk = max(1, min(MAX_CHUNK, CHUNK_CELLS // (size[0] * size[1])))
+	# Keep a few chunks per worker so the pool stays balanced near the end
+	balanced = -(-nbGames // (workers * 4))
+	return max(1, min(chunk, balanced))
+
+
+def playChunk(size, nbBombs, seeds, firstClick, guess):
+	return [playGame(size, nbBombs, seed, firstClick, guess) for seed in seeds]
+
+
+def runTournament(size, nbBombs, seeds, firstClick='center', guess=False, workers=None, chunkSize=None, threads=False):
+	"""
+	Play every seed on a process pool, or a thread pool with threads=True \n
+	Results are merged in seed order so the stats do not depend on the worker count.
+	Every game owns its board, generator and solver and the component cache
+	is locked, so threads only pay off on free-threaded Python builds but
+	skip pickling the chunks and results
+	"""
+	workers = workers or os.cpu_count() or 1
+	chunkSize = chunkSize or getChunkSize(size, len(seeds), workers)
+	chunks = [seeds[i:i + chunkSize] for i in range(0, len(seeds), chunkSize)]
+
+	stats = Stats()
+	pool = ThreadPoolExecutor if threads else ProcessPoolExecutor
+	with pool(max_workers=workers) as executor:
+		futures = [executor.submit(playChunk, size, nbBombs, chunk, firstClick, guess) for chunk in chunks]
+		for future in futures:
+			for result in future.result():
+				stats.add(result)
+	return stats
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Run the solver over seeded boards on a process or thread pool')
+	parser.add_argument('--size', type=int, nargs=2, default=(16, 30), metavar=('ROWS', 'COLS'))
+	parser.add_argument('--bombs', type=int, default=99)
+	parser.add_argument('--seeds', type=int, nargs=2, default=(0, 10000), metavar=('START', 'STOP'))
+	parser.add_argument('--first-click', type=parseFirstClick, default='center', help="center, corner, random or 'row,col'")
+	parser.add_argument('--guess', action='store_true', help='guess the safest cell instead of stopping')
+	parser.add_argument('--workers', type=int, default=None)
+	parser.add_argument('--chunk-size', type=int, default=None)
+	parser.add_argument('--threads', action='store_true', help='use a thread pool instead of a process pool')
+	args = parser.parse_args(argv)
+
+	stats = runTournament(tuple(args.size), args.bombs, range(*args.seeds), args.first_click, args.guess, args.workers, args.chunk_size, args.threads)
+	print(stats.report())
+
+
+if __name__ == '__main__':
+	main()